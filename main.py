@@ -1,9 +1,9 @@
 
-import pygame, sys
+import pygame, sys, time
 from tetris_rng import NESRandom
 from tetris_config import CONFIG
-from tetris_piece import Piece, try_rotate
-from tetris_board import collide, merge, sweep, ghost_y
+from tetris_piece import Piece, PIECE_MASKS, try_rotate
+from tetris_board import BitBoard, collide, collide_at, merge, sweep, ghost_y
 from tetris_input import ShiftRepeat
 from tetris_overlay import Overlay
 from tetris_layout import compute_dims, COLS, ROWS
@@ -16,6 +16,11 @@ def gravity_interval(level):
     return max(60, int((base - level * step) / mult))
 
 
+def gravity_table():
+    # Levels are effectively capped (~29 in classic rules); 40 is plenty.
+    return tuple(gravity_interval(L) for L in range(40))
+
+
 def recreate_window(dims, flags=pygame.DOUBLEBUF):
     try:
         return pygame.display.set_mode((dims.total_w, dims.total_h), flags, vsync=1)
@@ -23,17 +28,32 @@ def recreate_window(dims, flags=pygame.DOUBLEBUF):
         return pygame.display.set_mode((dims.total_w, dims.total_h), flags)
 
 
-def piece_cells(p):
-    cells = []
-    for r, row in enumerate(p.shape):
-        for c, v in enumerate(row):
-            if v and p.y + r >= 0:
-                cells.append((p.x + c, p.y + r))
-    return cells
+def draw_piece_and_ghost(screen, render, p, gy):
+    # Composite surfaces per (type, state): one blit for the ghost, one for
+    # the piece. Clip to the board so rows above the top never paint outside.
+    d = render.dims; c = d.cell
+    prev_clip = screen.get_clip()
+    screen.set_clip(render.board_rect)
+    screen.blit(render.piece_ghost_surf[p.t][p.state], (d.board_x + p.x*c, d.board_y + gy*c))
+    screen.blit(render.piece_surf[p.t][p.state], (d.board_x + p.x*c, d.board_y + p.y*c))
+    screen.set_clip(prev_clip)
+
+
+def piece_col_bits(p, y=None):
+    """Column bitmasks of the piece's on-board cells (rows above the top drop out)."""
+    cols = [0] * COLS
+    yy = p.y if y is None else y
+    for i, m in enumerate(PIECE_MASKS[p.t][p.state]):
+        if m:
+            cols[p.x + i] = (m << yy) if yy >= 0 else (m >> -yy)
+    return cols
 
 
 def main():
     pygame.init()
+    # Block everything at the SDL layer, then allow only what we handle, so
+    # focus changes/mouse floods never reach the Python event loop
+    pygame.event.set_blocked(None)
     pygame.event.set_allowed([pygame.QUIT, pygame.KEYDOWN, pygame.KEYUP])
 
     dims = compute_dims()
@@ -45,13 +65,25 @@ def main():
     render = RenderAssets(dims, font)
     clock = pygame.time.Clock()
 
-    board = [[None] * COLS for _ in range(ROWS)]
+    # Restart (R) returns here: window/fonts/assets persist across games
+    # instead of re-entering main() recursively and re-initing everything.
+    while True:
+        screen, dims, render = _play_one_game(screen, dims, render, font, big_font, clock)
+
+
+def _play_one_game(screen, dims, render, font, big_font, clock):
+    board = BitBoard()
     rng = NESRandom(CONFIG["NES_SEED"], CONFIG["NES_FIRST_PIECE_AVOID_SZO"])
     current = Piece.spawn(rng.next_piece())
     next_type = rng.next_piece()
 
     score = lines = level = 0
-    grav = gravity_interval(level)
+    grav_table = gravity_table()
+    grav_mult = CONFIG["GRAVITY_MULT"]
+    grav = grav_table[level]
+    # Hoisted CONFIG reads; refreshed after overlay edits, the only writer
+    soft_mult = max(1, int(CONFIG["SOFT_DROP_MULT"]))
+    lock_delay = CONFIG["LOCK_DELAY_MS"]
     acc = 0
     lock_timer = 0
     is_grounded = False
@@ -59,14 +91,17 @@ def main():
     shift = ShiftRepeat()
     overlay = Overlay()
     soft_drop_held = False
+    left_held = right_held = False
+    overlay_dirty = False
 
     # Build initial board surface (empty) and force one-time full redraw
     render.rebuild_board_surface(board)
     need_full_redraw = True
 
-    # Track previous positions for dirty rects
-    prev_piece = piece_cells(current)
-    prev_ghost = []
+    # Track previous piece/ghost occupancy (column bitmasks) for dirty rects
+    prev_pbits = piece_col_bits(current)
+    prev_gbits = [0] * COLS
+    prev_hud = None
 
     def refresh_assets_if_cell_changed():
         nonlocal dims, screen, render, need_full_redraw
@@ -79,44 +114,86 @@ def main():
             # After resizing/rebuilding, redraw full screen once
             need_full_redraw = True
 
+    # ghost_y memo: valid until the piece moves or the board contents change
+    board_version = 0
+    ghost_key = None
+    ghost_val = 0
+
+    def cur_ghost():
+        nonlocal ghost_key, ghost_val
+        k = (board_version, current.t, current.state, current.x, current.y)
+        if k != ghost_key:
+            ghost_key = k
+            ghost_val = ghost_y(board, current)
+        return ghost_val
+
+    def lock_and_spawn():
+        # Shared tail of the hard-drop and lock-delay paths
+        nonlocal score, lines, level, grav, current, next_type, acc, lock_timer, is_grounded, board_version
+        board_version += 1
+        merge(board, current)
+        render.patch_piece(current)
+        c = sweep(board)
+        if c:
+            score += c * (level + 1) * 100; lines += c
+            if lines // 10 > level:
+                level += 1; grav = grav_table[min(level, 39)]
+            # Rows shifted: refresh the cache and redraw the whole board region.
+            # Without a clear, the locked cells match the piece sprite pixels and
+            # the piece/ghost bitmask diff already marks everything that changed.
+            render.rebuild_board_surface(board)
+            dirty.append(render.board_rect.copy())
+        current = Piece.spawn(next_type)
+        next_type = rng.next_piece()
+        acc = 0; lock_timer = 0; is_grounded = False
+
+    # Bind hot globals to locals: LOAD_FAST instead of LOAD_GLOBAL/LOAD_ATTR
+    # on the per-frame paths below.
+    _collide_at = collide_at; _Piece = Piece
+    _event_get = pygame.event.get
+
+    last_ns = time.monotonic_ns()
+
     while True:
-        dt = clock.tick_busy_loop(60)
+        # tick() sleeps instead of spinning; monotonic_ns drives the sim clock
+        clock.tick(60)
+        now_ns = time.monotonic_ns()
+        dt = (now_ns - last_ns) / 1e6
+        last_ns = now_ns
         acc += dt
         dirty = []
 
-        for e in pygame.event.get():
+        for e in _event_get():
             if e.type == pygame.QUIT:
                 pygame.quit(); sys.exit()
-            if e.type == pygame.KEYDOWN:
+            elif e.type == pygame.KEYDOWN:
                 if e.key == pygame.K_F1:
-                    overlay.toggle(); continue
+                    overlay.toggle(); overlay_dirty = True; continue
                 if overlay.active:
-                    overlay.handle(e); continue
+                    overlay.handle(e); overlay_dirty = True
+                    # Overlay edits are the only way CELL_SIZE/GRAVITY_MULT can change
+                    refresh_assets_if_cell_changed()
+                    if CONFIG["GRAVITY_MULT"] != grav_mult:
+                        grav_mult = CONFIG["GRAVITY_MULT"]
+                        grav_table = gravity_table()
+                        grav = grav_table[min(level, 39)]
+                    soft_mult = max(1, int(CONFIG["SOFT_DROP_MULT"]))
+                    lock_delay = CONFIG["LOCK_DELAY_MS"]
+                    shift.refresh_config()
+                    continue
                 if e.key == pygame.K_UP:
                     t = try_rotate(board, current, True)
                     if t: current = t; lock_timer = 0
-                if e.key == pygame.K_z:
+                elif e.key == pygame.K_z:
                     t = try_rotate(board, current, False)
                     if t: current = t; lock_timer = 0
-                if e.key == pygame.K_SPACE:
-                    drop = 0
-                    while True:
-                        test = Piece(current.t, [r[:] for r in current.shape], current.state, current.x, current.y + 1)
-                        if collide(board, test): break
-                        current = test; drop += 1
+                elif e.key == pygame.K_SPACE:
+                    gy = cur_ghost()
+                    drop = gy - current.y
+                    if drop:
+                        current = _Piece(current.t, current.state, current.x, gy)
                     score += drop * 2
-                    merge(board, current)
-                    c = sweep(board)
-                    if c:
-                        score += c * (level + 1) * 100; lines += c
-                        if lines // 10 > level:
-                            level += 1; grav = gravity_interval(level)
-                    render.rebuild_board_surface(board)
-                    # Redraw whole board region after lock/sweep
-                    dirty.append(render.board_rect.copy())
-                    current = Piece.spawn(next_type)
-                    next_type = rng.next_piece()
-                    acc = 0; lock_timer = 0; is_grounded = False
+                    lock_and_spawn()
                     if collide(board, current):
                         # Full redraw + simple flip on game over prompt
                         render.blit_bg_region(screen, screen.get_rect())
@@ -125,130 +202,149 @@ def main():
                         rect = msg.get_rect(center=(dims.board_x + dims.board_w // 2, dims.board_y + dims.board_h // 2))
                         screen.blit(msg, rect)
                         pygame.display.flip()
-                        waiting = True
-                        while waiting:
-                            for ev in pygame.event.get():
-                                if ev.type == pygame.QUIT: pygame.quit(); sys.exit()
-                                if ev.type == pygame.KEYDOWN and ev.key == pygame.K_r: return main()
-                if e.key == pygame.K_DOWN:
+                        while True:
+                            # Block until an event arrives instead of spinning
+                            ev = pygame.event.wait()
+                            if ev.type == pygame.QUIT: pygame.quit(); sys.exit()
+                            if ev.type == pygame.KEYDOWN and ev.key == pygame.K_r:
+                                # Hand current window/assets back for the next game
+                                return screen, dims, render
+                elif e.key == pygame.K_DOWN:
                     soft_drop_held = True
-            if e.type == pygame.KEYUP:
-                if overlay.active: continue
+                elif e.key == pygame.K_LEFT:
+                    left_held = True
+                elif e.key == pygame.K_RIGHT:
+                    right_held = True
+            elif e.type == pygame.KEYUP:
+                # Always process releases, even with the overlay open —
+                # otherwise a held flag sticks and the piece auto-shifts
+                # after the overlay closes
                 if e.key == pygame.K_DOWN:
                     soft_drop_held = False
-
-        refresh_assets_if_cell_changed()
+                elif e.key == pygame.K_LEFT:
+                    left_held = False
+                elif e.key == pygame.K_RIGHT:
+                    right_held = False
 
         if overlay.active:
+            # Game state is frozen while the overlay is open, so the screen only
+            # changes when an overlay event was handled; skip identical frames.
+            if not overlay_dirty:
+                continue
+            overlay_dirty = False
             # For overlay we keep simple full redraw
             render.blit_bg_region(screen, screen.get_rect())
             render.blit_board_region(screen, render.board_rect)
             # Current + ghost
-            gy = ghost_y(board, current)
-            for r, row in enumerate(current.shape):
-                for c, v in enumerate(row):
-                    if v and gy + r >= 0:
-                        screen.blit(render.ghost_surf[current.t], render.cell_rect(current.x + c, gy + r).inflate(-4, -4).topleft)
-            for r, row in enumerate(current.shape):
-                for c, v in enumerate(row):
-                    if v and current.y + r >= 0:
-                        screen.blit(render.cell_surf[current.t], render.cell_rect(current.x + c, current.y + r).inflate(-2, -2).topleft)
+            draw_piece_and_ghost(screen, render, current, cur_ghost())
             render.draw_panel_hud(screen, score, level, lines, next_type)
             overlay.draw(screen, font, dims.total_w, dims.total_h)
             pygame.display.flip()
             # Reset trackers and clear the full redraw request
-            prev_piece = piece_cells(current)
-            prev_ghost = []
+            prev_pbits = piece_col_bits(current)
+            prev_gbits = [0] * COLS
             need_full_redraw = False
             continue
 
-        # Soft drop
+        # Soft drop: one clamped step — the cached ghost row bounds the distance
         if soft_drop_held:
-            sd = max(1, int(CONFIG["SOFT_DROP_MULT"]))
-            for _ in range(sd):
-                t = Piece(current.t, [r[:] for r in current.shape], current.state, current.x, current.y + 1)
-                if not collide(board, t): current = t; score += 1
-                else: break
+            cells = min(soft_mult, cur_ghost() - current.y)
+            if cells > 0:
+                score += cells
+                current = _Piece(current.t, current.state, current.x, current.y + cells)
 
         # Horizontal
-        keys = pygame.key.get_pressed()
-        step = shift.update(dt, keys[pygame.K_LEFT], keys[pygame.K_RIGHT])
+        step = shift.update(dt, left_held, right_held)
         if step:
-            t = Piece(current.t, [r[:] for r in current.shape], current.state, current.x + step, current.y)
-            if not collide(board, t):
-                current = t
-                down = Piece(current.t, [r[:] for r in current.shape], current.state, current.x, current.y + 1)
-                if collide(board, down): lock_timer = 0
-
-        # Gravity / lock
-        down = Piece(current.t, [r[:] for r in current.shape], current.state, current.x, current.y + 1)
-        grounded = collide(board, down)
-        if grounded:
+            if not _collide_at(board, current.t, current.state, current.x + step, current.y):
+                current = _Piece(current.t, current.state, current.x + step, current.y)
+                if cur_ghost() == current.y:
+                    lock_timer = 0
+
+        # Gravity / lock — grounded and step count both fall out of the memoized
+        # ghost row: grounded iff the piece is already at its landing row.
+        if cur_ghost() == current.y:
             is_grounded = True
             lock_timer += dt
-            if lock_timer >= CONFIG["LOCK_DELAY_MS"]:
-                merge(board, current)
-                c = sweep(board)
-                if c:
-                    score += c * (level + 1) * 100; lines += c
-                    if lines // 10 > level:
-                        level += 1; grav = gravity_interval(level)
-                render.rebuild_board_surface(board)
-                dirty.append(render.board_rect.copy())
-                current = Piece.spawn(next_type)
-                next_type = rng.next_piece()
-                acc = 0; lock_timer = 0; is_grounded = False
+            if lock_timer >= lock_delay:
+                lock_and_spawn()
         else:
             is_grounded = False
             lock_timer = 0
 
-        while acc >= grav and not is_grounded:
-            acc -= grav
-            t = Piece(current.t, [r[:] for r in current.shape], current.state, current.x, current.y + 1)
-            if not collide(board, t): current = t
-            else:
+        if not is_grounded and acc >= grav:
+            steps = int(acc // grav)
+            cells = min(steps, cur_ghost() - current.y)
+            if cells:
+                acc -= cells * grav
+                current = _Piece(current.t, current.state, current.x, current.y + cells)
+            if cells < steps:
+                # next step would have collided; it still consumes an interval
+                acc -= grav
                 is_grounded = True
                 lock_timer = 0
-                break
+
+        if overlay_dirty:
+            # Overlay just closed; it covered the whole screen, so repaint it all
+            need_full_redraw = True
+            overlay_dirty = False
 
         # If we need a full refresh (first frame or after resize), mark full regions
         if need_full_redraw:
             dirty.append(render.board_rect.copy())
             dirty.append(render.panel_rect.copy())
 
-        # Compute new piece & ghost cells and mark dirty areas (prev + new)
-        new_piece = piece_cells(current)
-        gy = ghost_y(board, current)
-        new_ghost = [(current.x + c, gy + r) for r, row in enumerate(current.shape) for c, v in enumerate(row) if v and gy + r >= 0]
-        for (cx, cy) in set(prev_piece + prev_ghost + new_piece + new_ghost):
-            dirty.append(render.cell_rect(cx, cy))
-        prev_piece, prev_ghost = new_piece, new_ghost
-
-        # Expand rects a bit to avoid seam artifacts
-        dirty = [r.inflate(2, 2) for r in dirty]
-        # Always include HUD if it changed this frame
-        hud_dirty = render.draw_panel_hud(screen, score, level, lines, next_type)
-        dirty.extend(hud_dirty)
-
-        # Redraw each dirty region: bg + board + moving piece overlays inside it
-        for r in dirty:
-            render.blit_bg_region(screen, r)
-            render.blit_board_region(screen, r)
-        # Draw current & ghost (overdraw into dirty areas is ok)
-        for r, row in enumerate(current.shape):
-            for c, v in enumerate(row):
-                if v and gy + r >= 0:
-                    screen.blit(render.ghost_surf[current.t], render.cell_rect(current.x + c, gy + r).inflate(-4, -4).topleft)
-        for r, row in enumerate(current.shape):
-            for c, v in enumerate(row):
-                if v and current.y + r >= 0:
-                    screen.blit(render.cell_surf[current.t], render.cell_rect(current.x + c, current.y + r).inflate(-2, -2).topleft)
-
-        # Flip only the dirty rectangles
-        if dirty:
-            pygame.display.update(dirty)
+        # Diff piece/ghost occupancy bitmasks; only cells that changed get a rect
+        new_pbits = piece_col_bits(current)
+        gy = cur_ghost()
+        new_gbits = piece_col_bits(current, gy)
+        for x in range(COLS):
+            m = (prev_pbits[x] ^ new_pbits[x]) | (prev_gbits[x] ^ new_gbits[x])
+            while m:
+                cy = (m & -m).bit_length() - 1
+                dirty.append(render.cell_dirty_rects[cy][x])
+                m &= m - 1
+        prev_pbits, prev_gbits = new_pbits, new_gbits
+
+        # Include the HUD panel only when one of its values changed
+        hud_state = (score, level, lines, next_type)
+        hud_changed = hud_state != prev_hud
+        prev_hud = hud_state
+        if hud_changed:
+            dirty.append(render.panel_rect.copy())
+
+        if not dirty:
+            # Identical frame: skip the draw pass and the buffer swap entirely
+            continue
+
+        # Past a threshold, per-rect update() costs more than a single flip
+        if len(dirty) > 24 or sum(r.w * r.h for r in dirty) >= dims.total_w * dims.total_h // 2:
+            render.blit_bg_region(screen, screen.get_rect())
+            render.blit_board_region(screen, render.board_rect)
+            render.draw_panel_hud(screen, score, level, lines, next_type)
+            draw_piece_and_ghost(screen, render, current, gy)
+            pygame.display.flip()
         else:
-            pygame.display.update()
+            # Coalesce touching/overlapping rects so SDL sees fewer, larger updates
+            dirty.sort(key=lambda r: (r.y, r.x))
+            merged = []
+            for r in dirty:
+                if merged and merged[-1].colliderect(r):
+                    # union (not union_ip): dirty may hold cached rects
+                    merged[-1] = merged[-1].union(r)
+                else:
+                    merged.append(r)
+            dirty = merged
+            # Redraw each dirty region: bg + board, then overlays on top
+            for r in dirty:
+                render.blit_bg_region(screen, r)
+                render.blit_board_region(screen, r)
+            if hud_changed:
+                # Repaint HUD text over the freshly cleared panel
+                render.draw_panel_hud(screen, score, level, lines, next_type)
+            draw_piece_and_ghost(screen, render, current, gy)
+            # Flip only the dirty rectangles
+            pygame.display.update(dirty)
 
         # One-time full redraw handled – go back to normal dirty rects
         need_full_redraw = False
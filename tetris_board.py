@@ -1,37 +1,82 @@
 
-"""Board helpers: collide, merge, sweep, ghost"""
+"""Board helpers: collide, merge, sweep, ghost on a column bitboard"""
+from array import array
+from dataclasses import dataclass, field
 from typing import Optional, List
-from tetris_piece import Piece, COLS, ROWS
+from tetris_piece import Piece, PIECE_MASKS, COLS, ROWS
 
-Board = List[List[Optional[str]]]
+FULL_COL = (1 << ROWS) - 1
+FLOOR = ~FULL_COL  # bits at ROWS and below the board always read occupied
 
-def collide(board: Board, piece: Piece) -> bool:
-    for y,row in enumerate(piece.shape):
-        for x,v in enumerate(row):
-            if not v: continue
-            bx,by = piece.x+x, piece.y+y
-            if bx<0 or bx>=COLS or by>=ROWS: return True
-            if by>=0 and board[by][bx]: return True
+@dataclass
+class BitBoard:
+    """cols[x] bit y set == cell (x,y) occupied; colors mirrors it for rendering only.
+
+    colors is a flat row-major bytearray of piece ids (Piece.t, 0 = empty)
+    indexed colors[y*COLS + x] — 200 contiguous bytes instead of 20 lists
+    of object pointers.
+    """
+    cols: array = field(default_factory=lambda: array('I', [0]*COLS))
+    colors: bytearray = field(default_factory=lambda: bytearray(ROWS*COLS))
+
+Board = BitBoard
+
+def _shift(m: int, y: int) -> int:
+    # cells above the top of the board (y<0) never collide; shift them out
+    return m << y if y >= 0 else m >> -y
+
+def collide_at(board: Board, t: int, state: int, x: int, y: int) -> bool:
+    """Mask-table collision probe — no Piece construction, no shape copy."""
+    cols = board.cols
+    for i, m in enumerate(PIECE_MASKS[t][state]):
+        if not m: continue
+        bx = x + i
+        if bx < 0 or bx >= COLS: return True
+        sm = _shift(m, y)
+        if sm >> ROWS or cols[bx] & sm: return True
     return False
 
-def merge(board:Board, piece:Piece):
-    for y,r in enumerate(piece.shape):
-        for x,v in enumerate(r):
-            if v:
-                by = piece.y+y
-                if by>=0: board[by][piece.x+x]=piece.t
-
-def sweep(board:Board)->int:
-    c=0; y=ROWS-1
-    while y>=0:
-        if all(board[y][x] for x in range(COLS)):
-            del board[y]; board.insert(0,[None]*COLS); c+=1
-        else: y-=1
-    return c
+def collide(board: Board, piece: Piece) -> bool:
+    return collide_at(board, piece.t, piece.state, piece.x, piece.y)
+
+def merge(board: Board, piece: Piece):
+    cols = board.cols; colors = board.colors; y = piece.y
+    tid = piece.t  # piece id doubles as the color byte
+    for i, m in enumerate(PIECE_MASKS[piece.t][piece.state]):
+        if not m: continue
+        x = piece.x + i
+        cols[x] |= _shift(m, y)
+        while m:
+            r = (m & -m).bit_length() - 1
+            if y+r >= 0: colors[(y+r)*COLS + x] = tid
+            m &= m - 1
 
-def ghost_y(board:Board,piece:Piece)->int:
-    from copy import deepcopy
-    t=deepcopy(piece)
+def sweep(board: Board) -> int:
+    cols = board.cols; c = 0
     while True:
-        t.y+=1
-        if collide(board,t): return t.y-1
+        full = FULL_COL
+        for x in range(COLS): full &= cols[x]
+        if not full: break
+        # clear bottom-most full row; rows above it shift down (bit index +1)
+        i = full.bit_length() - 1
+        low = (1 << i) - 1
+        for x in range(COLS):
+            v = cols[x]
+            cols[x] = ((v & low) << 1) | (v & ~((low << 1) | 1))
+        del board.colors[i*COLS:(i+1)*COLS]; board.colors[0:0] = bytes(COLS)
+        c += 1
+    return c
+
+def ghost_y(board: Board, piece: Piece) -> int:
+    """Landing row via count-trailing-zeros per column mask — no step loop."""
+    # drop must start above any reachable distance: a piece wholly above the
+    # visible board (y < 0) can fall more than ROWS rows
+    cols = board.cols; y = piece.y; drop = ROWS + 4
+    for i, m in enumerate(PIECE_MASKS[piece.t][piece.state]):
+        if not m: continue
+        s = y + m.bit_length()  # one past the piece's bottom cell in this column
+        b = (cols[piece.x+i] | FLOOR) >> s if s >= 0 else cols[piece.x+i] | FLOOR
+        d = (b & -b).bit_length() - 1
+        if s < 0: d -= s
+        if d < drop: drop = d
+    return y + drop
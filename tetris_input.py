@@ -6,19 +6,26 @@ from tetris_config import CONFIG
 
 class ShiftRepeat:
     def __init__(self):
-        self.dir=0; self.held_ms=0; self.last=0; self.initial=False
+        self.dir=0; self.held_ms=0; self.last=0
+        self.refresh_config()
+    def refresh_config(self):
+        # DAS/ARR cached as attributes; main() calls this after overlay edits,
+        # the only place CONFIG changes, so update() skips the dict lookups.
+        self.das=CONFIG["DAS_MS"]; self.arr=CONFIG["ARR_MS"]
     def update(self, dt, left, right):
+        # Steady-state (held direction) falls straight through to the ARR
+        # check; the direction-change branch doubles as the initial emit.
         nd=(-1 if left else 0)+(1 if right else 0)
         if nd!=self.dir:
-            self.dir=nd; self.held_ms=0; self.last=0; self.initial=False
-        if self.dir==0: return 0
+            self.dir=nd; self.held_ms=dt; self.last=0
+            return nd
+        if nd==0: return 0
         self.held_ms+=dt
-        if not self.initial:
-            self.initial=True; return self.dir
-        if self.held_ms < CONFIG["DAS_MS"]: return 0
-        arr=CONFIG["ARR_MS"]
-        if arr==0: return self.dir
+        if self.held_ms < self.das: return 0
+        arr=self.arr
+        if arr==0: return nd
         self.last+=dt
         if self.last>=arr:
-            self.last=0; return self.dir
+            self.last-=arr  # carry remainder so ARR doesn't drift with dt
+            return nd
         return 0
@@ -1,5 +1,6 @@
 
 from dataclasses import dataclass
+from functools import lru_cache
 from tetris_config import CONFIG
 
 COLS, ROWS = 10, 20
@@ -19,7 +20,12 @@ class Dims:
     panel_y: int
 
 def compute_dims() -> Dims:
-    cell = int(CONFIG["CELL_SIZE"])  # px per cell
+    # Pure function of CELL_SIZE; memoized per size so overlay-time calls
+    # reuse the same Dims instance
+    return _compute(int(CONFIG["CELL_SIZE"]))
+
+@lru_cache(maxsize=None)
+def _compute(cell: int) -> Dims:
     margin = 16
     panel_w = 220
     board_w = COLS * cell
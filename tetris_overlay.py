@@ -15,6 +15,8 @@ class Overlay:
             ("NES_FIRST_PIECE_AVOID_SZO","No SZO first",False,True,None),
         ]
         self.index=0
+        self._labels={}  # (i, value, selected) -> rendered surface
+        self._backdrop=None  # translucent panel, rebuilt only on size change
 
     def toggle(self): self.active=not self.active
 
@@ -32,11 +34,21 @@ class Overlay:
 
     def draw(self,screen,font,w,h):
         if not self.active: return
-        s=pygame.Surface((w-80,h-80),pygame.SRCALPHA); s.fill((20,25,40,230))
+        s=self._backdrop
+        if s is None or s.get_size()!=(w-80,h-80):
+            s=pygame.Surface((w-80,h-80),pygame.SRCALPHA); s.fill((20,25,40,230))
+            self._backdrop=s=s.convert_alpha()
         screen.blit(s,(40,40))
         y=80
+        labels=self._labels
+        seq=[]
         for i,(key,label,lo,hi,step) in enumerate(self.items):
-            col=(255,255,255) if i==self.index else (200,210,235)
+            sel=i==self.index
             v=CONFIG[key]
-            txt=f"{label}: {v}"
-            screen.blit(font.render(txt,True,col),(60,40+y)); y+=30
+            k=(i,v,sel)
+            surf=labels.get(k)
+            if surf is None:
+                # re-rendered only when the value or selection changes
+                surf=labels[k]=font.render(f"{label}: {v}",True,(255,255,255) if sel else (200,210,235))
+            seq.append((surf,(60,40+y))); y+=30
+        screen.blits(seq,doreturn=False)
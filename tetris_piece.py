@@ -5,6 +5,9 @@ from typing import List, Optional, Dict, Tuple
 
 COLS, ROWS = 10, 20
 
+PIECE_TYPES = ("I","J","L","O","S","T","Z")
+TYPE_ID = {t: i+1 for i, t in enumerate(PIECE_TYPES)}  # 0 = empty cell
+
 SHAPES = {
     "I": [[0,0,0,0],[1,1,1,1],[0,0,0,0],[0,0,0,0]],
     "J": [[1,0,0],[1,1,1],[0,0,0]],
@@ -18,53 +21,92 @@ SHAPES = {
 def rotate_cw(m): return [list(r) for r in zip(*m[::-1])]
 def rotate_ccw(m): return [list(c) for c in zip(*m)][::-1]
 
+def _col_masks(shape):
+    return tuple(sum(1<<r for r in range(len(shape)) if shape[r][c]) for c in range(len(shape[0])))
+
+# Built once at import, indexed by piece id (TYPE_ID values; slot 0 unused so
+# the ids used in the board's color bytes index these tables directly):
+#   SHAPES_BY_STATE[t][state] = immutable tuple-of-tuples shape matrix
+#   PIECE_MASKS[t][state][c]  = bitmask of filled rows in column c of that rotation
+# so spawns/rotations share references and collision probes never touch matrices.
+_shapes_by_id = [None]; _masks_by_id = [None]
+for _t in PIECE_TYPES:
+    _s = SHAPES[_t]; _shapes = []; _states = []
+    for _ in range(4):
+        _shapes.append(tuple(tuple(r) for r in _s))
+        _states.append(_col_masks(_s)); _s = rotate_cw(_s)
+    _shapes_by_id.append(tuple(_shapes))
+    _masks_by_id.append(tuple(_states))
+SHAPES_BY_STATE: Tuple[Optional[tuple], ...] = tuple(_shapes_by_id)
+PIECE_MASKS: Tuple[Optional[tuple], ...] = tuple(_masks_by_id)
+del _t, _s, _shapes, _states, _shapes_by_id, _masks_by_id
+
+# PIECE_CELLS[t][state] = ((dx,dy), ...) filled-cell offsets derived from PIECE_MASKS,
+# so draw/iteration code skips the empty cells of the shape matrix.
+PIECE_CELLS: Tuple[Optional[tuple], ...] = (None,) + tuple(
+    tuple(tuple((i, r) for i, m in enumerate(_st) for r in range(m.bit_length()) if m >> r & 1)
+          for _st in PIECE_MASKS[_tid])
+    for _tid in range(1, len(PIECE_TYPES) + 1)
+)
+
+def _spawn_xy(s):
+    empty = 0
+    for r in s:
+        if all(v==0 for v in r): empty+=1
+        else: break
+    return ((COLS - len(s[0]))//2, -min(empty, 2))
+
+# Spawn position per piece id, resolved once instead of scanning the shape
+# for leading empty rows on every spawn.
+SPAWN_XY: Tuple[Optional[Tuple[int,int]], ...] = (None,) + tuple(
+    _spawn_xy(SHAPES_BY_STATE[_tid][0]) for _tid in range(1, len(PIECE_TYPES) + 1)
+)
+
+_DEFAULT_KICKS = ((0,0),)
+
 JLSTZ_KICKS = {
-    (0,1):[(0,0),(-1,0),(-1,1),(0,-2),(-1,-2)],
-    (1,0):[(0,0),(1,0),(1,-1),(0,2),(1,2)],
-    (1,2):[(0,0),(1,0),(1,-1),(0,2),(1,2)],
-    (2,1):[(0,0),(-1,0),(-1,1),(0,-2),(-1,-2)],
-    (2,3):[(0,0),(1,0),(1,1),(0,-2),(1,-2)],
-    (3,2):[(0,0),(-1,0),(-1,-1),(0,2),(-1,2)],
-    (3,0):[(0,0),(-1,0),(-1,-1),(0,2),(-1,2)],
-    (0,3):[(0,0),(1,0),(1,1),(0,-2),(1,-2)],
+    (0,1):((0,0),(-1,0),(-1,1),(0,-2),(-1,-2)),
+    (1,0):((0,0),(1,0),(1,-1),(0,2),(1,2)),
+    (1,2):((0,0),(1,0),(1,-1),(0,2),(1,2)),
+    (2,1):((0,0),(-1,0),(-1,1),(0,-2),(-1,-2)),
+    (2,3):((0,0),(1,0),(1,1),(0,-2),(1,-2)),
+    (3,2):((0,0),(-1,0),(-1,-1),(0,2),(-1,2)),
+    (3,0):((0,0),(-1,0),(-1,-1),(0,2),(-1,2)),
+    (0,3):((0,0),(1,0),(1,1),(0,-2),(1,-2)),
 }
 I_KICKS = {
-    (0,1):[(0,0),(-2,0),(1,0),(-2,-1),(1,2)],
-    (1,0):[(0,0),(2,0),(-1,0),(2,1),(-1,-2)],
-    (1,2):[(0,0),(-1,0),(2,0),(-1,2),(2,-1)],
-    (2,1):[(0,0),(1,0),(-2,0),(1,-2),(-2,1)],
-    (2,3):[(0,0),(2,0),(-1,0),(2,1),(-1,-2)],
-    (3,2):[(0,0),(-2,0),(1,0),(-2,-1),(1,2)],
-    (3,0):[(0,0),(1,0),(-2,0),(1,-2),(-2,1)],
-    (0,3):[(0,0),(-1,0),(2,0),(-1,2),(2,-1)],
+    (0,1):((0,0),(-2,0),(1,0),(-2,-1),(1,2)),
+    (1,0):((0,0),(2,0),(-1,0),(2,1),(-1,-2)),
+    (1,2):((0,0),(-1,0),(2,0),(-1,2),(2,-1)),
+    (2,1):((0,0),(1,0),(-2,0),(1,-2),(-2,1)),
+    (2,3):((0,0),(2,0),(-1,0),(2,1),(-1,-2)),
+    (3,2):((0,0),(-2,0),(1,0),(-2,-1),(1,2)),
+    (3,0):((0,0),(1,0),(-2,0),(1,-2),(-2,1)),
+    (0,3):((0,0),(-1,0),(2,0),(-1,2),(2,-1)),
 }
 
-@dataclass
+I_ID = TYPE_ID["I"]
+
+@dataclass(slots=True)
 class Piece:
-    t: str
-    shape: List[List[int]]
+    t: int  # piece id per TYPE_ID; indexes the shape/mask/cell tables
     state: int
     x: int
     y: int
     @staticmethod
-    def spawn(t: str):
-        s = [r[:] for r in SHAPES[t]]
-        w = len(s[0])
-        empty = 0
-        for r in s:
-            if all(v==0 for v in r): empty+=1
-            else: break
-        return Piece(t, s, 0, (COLS-w)//2, -min(empty,2))
+    def spawn(t: int):
+        x, y = SPAWN_XY[t]
+        return Piece(t, 0, x, y)
 
 # rotation
 
 def try_rotate(board, piece, cw=True):
     old = piece.state
     new = (old + (1 if cw else -1)) % 4
-    ns = rotate_cw(piece.shape) if cw else rotate_ccw(piece.shape)
-    kicks = (I_KICKS if piece.t=="I" else JLSTZ_KICKS).get((old,new),[(0,0)])
-    from tetris_board import collide
+    kicks = (I_KICKS if piece.t==I_ID else JLSTZ_KICKS).get((old,new),_DEFAULT_KICKS)
+    from tetris_board import collide_at
     for dx,dy in kicks:
-        test = Piece(piece.t, [r[:] for r in ns], new, piece.x+dx, piece.y+dy)
-        if not collide(board,test): return test
+        # probe via the mask table; (t, state) identifies the rotated shape
+        if not collide_at(board, piece.t, new, piece.x+dx, piece.y+dy):
+            return Piece(piece.t, new, piece.x+dx, piece.y+dy)
     return None
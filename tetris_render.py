@@ -12,6 +12,7 @@ import pygame
 from dataclasses import dataclass
 from typing import Dict, Tuple, List, Optional
 from tetris_layout import Dims, COLS, ROWS
+from tetris_piece import PIECE_CELLS, PIECE_TYPES, SHAPES_BY_STATE
 
 COLORS: Dict[str, Tuple[int,int,int]] = {
     "I": (102,224,255),
@@ -22,19 +23,33 @@ COLORS: Dict[str, Tuple[int,int,int]] = {
     "T": (200,119,255),
     "Z": (255,102,119),
 }
+# Indexed by piece id (slot 0 = empty), matching the board's color bytes
+COLOR_BY_ID: Tuple[Optional[Tuple[int,int,int]], ...] = (None,) + tuple(COLORS[t] for t in PIECE_TYPES)
+
+# One C-level call for a batch of same-flag blits; fblits (pygame-ce) skips
+# the per-item rect returns, plain blits(doreturn=False) is the fallback
+if hasattr(pygame.Surface, "fblits"):
+    def _batch_blit(dest: pygame.Surface, seq) -> None: dest.fblits(seq)
+else:
+    def _batch_blit(dest: pygame.Surface, seq) -> None: dest.blits(seq, doreturn=False)
+
+TEXT_COL = (200,210,240)
+TITLE_COL = (197,202,233)
+HELP_COL = (165,175,215)
 
 @dataclass
 class HudCache:
     score: int = -1
     level: int = -1
     lines: int = -1
-    next_type: str = ""
+    next_type: int = 0
     title: Optional[pygame.Surface] = None
     score_s: Optional[pygame.Surface] = None
     level_s: Optional[pygame.Surface] = None
     lines_s: Optional[pygame.Surface] = None
     next_label: Optional[pygame.Surface] = None
-    controls: Optional[List[pygame.Surface]] = None
+    next_text: Optional[pygame.Surface] = None
+    controls: Optional[pygame.Surface] = None
 
 class RenderAssets:
     def __init__(self, dims: Dims, font: pygame.font.Font):
@@ -43,7 +58,11 @@ class RenderAssets:
         self._make_static()
         self._make_cells()
         self.hud = HudCache()
-        self.board_surface = pygame.Surface((dims.board_w, dims.board_h), pygame.SRCALPHA)
+        self._make_hud_static()
+        # Colorkey + RLE instead of per-pixel alpha: the surface is mostly
+        # empty, so SDL's RLE blit skips the transparent runs entirely
+        self.board_surface = pygame.Surface((dims.board_w, dims.board_h)).convert()
+        self.board_surface.set_colorkey((0,0,0), pygame.RLEACCEL)
 
     # ---- static background ----
     def _make_static(self):
@@ -57,44 +76,111 @@ class RenderAssets:
         for y in range(ROWS+1):
             Y = d.board_y + y*d.cell
             pygame.draw.line(self.bg, grid_col, (d.board_x, Y), (d.board_x + d.board_w, Y))
-        # Panel
+        # Panel (fill() takes the fast solid-rect path; outline stays draw.rect)
         panel_rect = pygame.Rect(d.panel_x, d.panel_y, d.panel_w, d.board_h)
-        pygame.draw.rect(self.bg, (21,25,53), panel_rect)
+        self.bg.fill((21,25,53), panel_rect)
         pygame.draw.rect(self.bg, (50,60,100), panel_rect, 1)
         # Next frame
         self.pv_cell = max(14, int(d.cell*0.75))
         self.pv_x = d.panel_x + 12
         self.pv_y = d.panel_y + 150
         frame = pygame.Rect(self.pv_x-6, self.pv_y-6, self.pv_cell*4+12, self.pv_cell*4+12)
-        pygame.draw.rect(self.bg, (15,18,40), frame)
+        self.bg.fill((15,18,40), frame)
         pygame.draw.rect(self.bg, (55,65,110), frame, 1)
 
+        # Display-format bg: blits skip per-pixel format conversion
+        self.bg = self.bg.convert()
+
         # Cached rects
         self.board_rect = pygame.Rect(d.board_x, d.board_y, d.board_w, d.board_h)
         self.panel_rect = pygame.Rect(d.panel_x, d.panel_y, d.panel_w, d.board_h)
 
+        # Pre-padded per-cell dirty rects, so the frame loop never calls inflate()
+        c = d.cell
+        self.cell_dirty_rects = [[pygame.Rect(d.board_x + x*c - 1, d.board_y + y*c - 1, c + 2, c + 2)
+                                  for x in range(COLS)] for y in range(ROWS)]
+
     # ---- sprite cache ----
     def _make_cells(self):
-        self.cell_surf: Dict[str, pygame.Surface] = {}
-        self.ghost_surf: Dict[str, pygame.Surface] = {}
+        # Indexed by piece id (slot 0 = empty) like the board's color bytes
+        self.cell_surf: List[Optional[pygame.Surface]] = [None]
+        self.ghost_surf: List[Optional[pygame.Surface]] = [None]
         c = self.dims.cell
-        for t, col in COLORS.items():
+        for t in PIECE_TYPES:
+            col = COLORS[t]
             s = pygame.Surface((c-2, c-2))
             s.fill(col)
-            self.cell_surf[t] = s
+            # convert to the display format so per-blit conversion is skipped
+            self.cell_surf.append(s.convert())
             g = pygame.Surface((c-8, c-8), pygame.SRCALPHA)
             pygame.draw.rect(g, col, (0,0,c-8,c-8), 2)
-            self.ghost_surf[t] = g
+            self.ghost_surf.append(g.convert_alpha())
+        # Preview-sized sprites for the Next box (pv_cell set in _make_static)
+        pv = self.pv_cell
+        self.pv_cell_surf: List[Optional[pygame.Surface]] = [None]
+        for t in PIECE_TYPES:
+            s = pygame.Surface((pv-2, pv-2))
+            s.fill(COLORS[t])
+            self.pv_cell_surf.append(s.convert())
+        # Whole-piece composites indexed [id][state]: the active piece and its
+        # ghost each become a single blit instead of one per cell
+        self.piece_surf: List[Optional[tuple]] = [None]
+        self.piece_ghost_surf: List[Optional[tuple]] = [None]
+        for tid in range(1, len(PIECE_TYPES) + 1):
+            cs, gh = self.cell_surf[tid], self.ghost_surf[tid]
+            ps = []; gs = []
+            for state in range(4):
+                cells = PIECE_CELLS[tid][state]
+                # Colorkey + RLE (no cell pixel is pure black): blits of these
+                # sparse 4x4-cell composites skip the transparent runs
+                p = pygame.Surface((4*c, 4*c)).convert()
+                g = pygame.Surface((4*c, 4*c)).convert()
+                _batch_blit(p, [(cs, (dx*c+1, dy*c+1)) for dx, dy in cells])
+                _batch_blit(g, [(gh, (dx*c+2, dy*c+2)) for dx, dy in cells])
+                p.set_colorkey((0,0,0), pygame.RLEACCEL)
+                g.set_colorkey((0,0,0), pygame.RLEACCEL)
+                ps.append(p); gs.append(g)
+            self.piece_surf.append(tuple(ps))
+            self.piece_ghost_surf.append(tuple(gs))
+
+    # ---- static HUD strings, rendered once at construction ----
+    def _make_hud_static(self):
+        f = self.font
+        self.hud.title = f.render("Classic Tetris", True, TITLE_COL).convert_alpha()
+        self.hud.next_text = f.render("Next:", True, TEXT_COL).convert_alpha()
+        # Controls legend composed into a single surface, one blit per draw
+        line_surfs = [f.render("Controls:", True, TEXT_COL)] + [
+            f.render(s, True, HELP_COL) for s in (
+                "←/→ Move", "↓ Soft drop", "↑ Rot CW", "Z Rot CCW",
+                "Space Hard", "P Pause • R Restart", "F1 Overlay")]
+        comp = pygame.Surface((max(s.get_width() for s in line_surfs), 20*len(line_surfs)), pygame.SRCALPHA)
+        for i, s in enumerate(line_surfs):
+            comp.blit(s, (0, i*20))
+        self.hud.controls = comp.convert_alpha()
 
     # ---- board surface ----
-    def rebuild_board_surface(self, board: List[List[Optional[str]]]):
-        self.board_surface.fill((0,0,0,0))
+    def rebuild_board_surface(self, board):
+        self.board_surface.fill((0,0,0))
+        c = self.dims.cell
+        colors = board.colors
+        by_id = self.cell_surf
+        seq = []
+        for x, m in enumerate(board.cols):
+            while m:
+                y = (m & -m).bit_length() - 1
+                seq.append((by_id[colors[y*COLS + x]], (x*c+1, y*c+1)))
+                m &= m - 1
+        if seq:
+            _batch_blit(self.board_surface, seq)
+
+    def patch_piece(self, piece):
+        """Blit a just-locked piece into the cached board surface — O(4) instead
+        of a full rebuild. Callers still rebuild when rows were cleared."""
         c = self.dims.cell
-        for y in range(ROWS):
-            for x in range(COLS):
-                t = board[y][x]
-                if t:
-                    self.board_surface.blit(self.cell_surf[t], (x*c+1, y*c+1))
+        s = self.cell_surf[piece.t]
+        for dx, dy in PIECE_CELLS[piece.t][piece.state]:
+            if piece.y + dy >= 0:
+                self.board_surface.blit(s, ((piece.x+dx)*c+1, (piece.y+dy)*c+1))
 
     def blit_bg_region(self, screen: pygame.Surface, region: pygame.Rect):
         screen.blit(self.bg, region, region)
@@ -115,38 +201,29 @@ class RenderAssets:
         )
 
     # ---- HUD: return list of dirty rects when changed ----
-    def draw_panel_hud(self, screen: pygame.Surface, score: int, level: int, lines: int, next_type: str) -> List[pygame.Rect]:
+    def draw_panel_hud(self, screen: pygame.Surface, score: int, level: int, lines: int, next_type: int) -> List[pygame.Rect]:
         dirty: List[pygame.Rect] = []
         d = self.dims
         f = self.font
         changed = False
-        if self.hud.title is None:
-            self.hud.title = f.render("Classic Tetris", True, (197,202,233)); changed = True
         if score != self.hud.score:
             self.hud.score = score
-            self.hud.score_s = f.render(f"Score: {score}", True, (200,210,240)); changed = True
+            self.hud.score_s = f.render(f"Score: {score}", True, TEXT_COL).convert_alpha(); changed = True
         if level != self.hud.level:
             self.hud.level = level
-            self.hud.level_s = f.render(f"Level: {level}", True, (200,210,240)); changed = True
+            self.hud.level_s = f.render(f"Level: {level}", True, TEXT_COL).convert_alpha(); changed = True
         if lines != self.hud.lines:
             self.hud.lines = lines
-            self.hud.lines_s = f.render(f"Lines: {lines}", True, (200,210,240)); changed = True
+            self.hud.lines_s = f.render(f"Lines: {lines}", True, TEXT_COL).convert_alpha(); changed = True
         if next_type != self.hud.next_type:
             self.hud.next_type = next_type
-            from tetris_piece import SHAPES
             s = pygame.Surface((self.pv_cell*4, self.pv_cell*4), pygame.SRCALPHA)
-            shape = SHAPES[next_type]
+            shape = SHAPES_BY_STATE[next_type][0]
             offx = (4 - len(shape[0])) // 2
             offy = max(0, (4 - len(shape)) // 2)
-            for y, row in enumerate(shape):
-                for x, v in enumerate(row):
-                    if v:
-                        rx = (x + offx) * self.pv_cell
-                        ry = (y + offy) * self.pv_cell
-                        block = pygame.Surface((self.pv_cell-2, self.pv_cell-2))
-                        block.fill(COLORS[next_type])
-                        s.blit(block, (rx+1, ry+1))
-            self.hud.next_label = s; changed = True
+            pv = self.pv_cell; block = self.pv_cell_surf[next_type]
+            _batch_blit(s, [(block, ((x+offx)*pv+1, (y+offy)*pv+1)) for x, y in PIECE_CELLS[next_type][0]])
+            self.hud.next_label = s.convert_alpha(); changed = True
 
         # If anything changed, mark full panel dirty for simplicity
         if changed:
@@ -157,24 +234,8 @@ class RenderAssets:
         if self.hud.score_s: screen.blit(self.hud.score_s, (d.panel_x + 12, d.panel_y + 44))
         if self.hud.level_s: screen.blit(self.hud.level_s, (d.panel_x + 12, d.panel_y + 68))
         if self.hud.lines_s: screen.blit(self.hud.lines_s, (d.panel_x + 12, d.panel_y + 92))
-        nl = f.render("Next:", True, (200,210,240))
-        screen.blit(nl, (d.panel_x + 12, d.panel_y + 126))
+        screen.blit(self.hud.next_text, (d.panel_x + 12, d.panel_y + 126))
         if self.hud.next_label: screen.blit(self.hud.next_label, (self.pv_x, self.pv_y))
 
-        # Controls legend (static)
-        if not self.hud.controls:
-            self.hud.controls = [
-                f.render("Controls:", True, (200,210,240)),
-                f.render("←/→ Move", True, (165,175,215)),
-                f.render("↓ Soft drop", True, (165,175,215)),
-                f.render("↑ Rot CW", True, (165,175,215)),
-                f.render("Z Rot CCW", True, (165,175,215)),
-                f.render("Space Hard", True, (165,175,215)),
-                f.render("P Pause • R Restart", True, (165,175,215)),
-                f.render("F1 Overlay", True, (165,175,215)),
-            ]
-            dirty.append(self.panel_rect.copy())
-        y = d.panel_y + 260
-        for surf in self.hud.controls:
-            screen.blit(surf, (d.panel_x + 12, y)); y += 20
+        screen.blit(self.hud.controls, (d.panel_x + 12, d.panel_y + 260))
         return dirty
@@ -11,6 +11,8 @@ class NESRandom:
         self.state = seed & 0xFFFFFFFF
         self.prev_index = None
         self.avoid_szo_first = avoid_szo_first
+        # First-piece rejection set, computed once instead of per call
+        self._bad_first = frozenset(self.PIECES.index(t) for t in "SZO")
 
     def _lcg_next(self):
         self.state = (self.state * 0x41C64E6D + 0x3039) & 0xFFFFFFFF
@@ -25,11 +27,11 @@ class NESRandom:
     def next_piece(self):
         cand = self._rand_choice7()
         if self.prev_index is None and self.avoid_szo_first:
-            bad = {self.PIECES.index("S"), self.PIECES.index("Z"), self.PIECES.index("O")}
-            while cand in bad:
+            while cand in self._bad_first:
                 cand = self._rand_choice7()
         if self.prev_index is not None and cand == self.prev_index:
             if (self._rand() & 1) == 1:
                 cand = self._rand_choice7()
         self.prev_index = cand
-        return self.PIECES[cand]
+        # 1-based piece id; PIECES order matches tetris_piece.TYPE_ID
+        return cand + 1